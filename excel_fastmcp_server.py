@@ -4,23 +4,43 @@ FastMCP Excel Server - A FastMCP server for Excel file operations
 """
 
 import asyncio
-import json
+import contextlib
+import functools
 import logging
 import re
 import os
+import posixpath
+import shutil
+import tempfile
+import zipfile
 import datetime
-from typing import Any, Dict, List, Optional, Generator
-from pathlib import Path
+import threading
+import traceback
+from collections import OrderedDict
+from itertools import zip_longest
+from typing import Any, Callable, Dict, List, Optional, Generator
+from xml.etree import ElementTree as ET
+from xml.sax.saxutils import escape
 
 import openpyxl
+import orjson
 from openpyxl.styles import Font, PatternFill, Border, Side, Alignment, Protection
 from openpyxl.utils import get_column_letter, column_index_from_string
-from openpyxl.utils.cell import coordinate_from_string
+from openpyxl.utils.cell import coordinate_from_string, coordinate_to_tuple, range_boundaries
 from openpyxl.worksheet.worksheet import Worksheet
-from openpyxl.cell import Cell
+from openpyxl.worksheet._read_only import ReadOnlyWorksheet
+from openpyxl.cell import Cell, MergedCell, WriteOnlyCell
+from openpyxl.cell.cell import ERROR_CODES, ILLEGAL_CHARACTERS_RE
+from openpyxl.styles.cell_style import StyleArray
 
 from fastmcp import FastMCP
 
+try:
+    # Optional Rust-based reader for read-only scans
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("excel-fastmcp-server")
@@ -28,6 +48,487 @@ logger = logging.getLogger("excel-fastmcp-server")
 # Get port from environment variable (Render sets this)
 PORT = int(os.environ.get("PORT", 8000))
 
+# Include formatted tracebacks in error responses (set DEBUG_TRACEBACKS to enable)
+DEBUG_TRACEBACKS = bool(os.environ.get("DEBUG_TRACEBACKS"))
+
+# Search sheets with calamine when it is installed (set USE_CALAMINE to enable). It only sees
+# cached formula results, so formulas saved without one (as openpyxl does) are not matched
+USE_CALAMINE = CalamineWorkbook is not None and bool(os.environ.get("USE_CALAMINE"))
+
+# Indent tool responses for reading by eye (set PRETTY_JSON to enable). Compact output is
+# smaller and faster to encode for large read_excel and find_cell_by_value results
+PRETTY_JSON = bool(os.environ.get("PRETTY_JSON"))
+
+def _dump(obj: Any, pretty: Optional[bool] = None) -> str:
+    """Serialize a tool response to JSON with orjson, indented if pretty (default PRETTY_JSON)."""
+    option = orjson.OPT_NON_STR_KEYS
+    if PRETTY_JSON if pretty is None else pretty:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, default=str, option=option).decode()
+
+# Validators for cell references, compiled once at import
+_CELL_RE = re.compile(r'[A-Z]+[0-9]+')
+_RANGE_COLON_RE = re.compile(r'[A-Z]+[0-9]*:')
+_FULL_RANGE_RE = re.compile(r'[A-Z]+[0-9]+:[A-Z]+[0-9]+')
+
+# Parsed workbooks keyed by (resolved path, mtime_ns, size, data_only, read_only), least recently used first
+_WB_CACHE: "OrderedDict[tuple, openpyxl.Workbook]" = OrderedDict()
+_WB_CACHE_SIZE = 8
+# Guards _WB_CACHE, which tool calls running in worker threads share
+_WB_LOCK = threading.RLock()
+# Per-file locks serializing tool calls that touch the same (possibly cached) workbook, as
+# [lock, number of holders and waiters]; an entry is dropped once that number is back to 0
+_FILE_LOCKS: Dict[str, list] = {}
+# Read-only workbooks evicted from the cache while their file was in use, by resolved path;
+# they are closed once the last call holding or waiting on that file's lock is done
+_CLOSE_LATER: Dict[str, List[openpyxl.Workbook]] = {}
+# Per-file asyncio locks, so calls waiting on a busy file queue on the event loop, in the
+# same [lock, holders and waiters] form
+_FILE_QUEUES: Dict[str, list] = {}
+# Edited workbooks waiting to be saved, keyed by resolved path: (workbook, timer, save, error).
+# Saves are deferred by _SAVE_DELAY seconds so that a burst of single-cell edits is written once;
+# a save that fails keeps its entry, with the exception, until a later call saves it
+_PENDING_SAVES: Dict[str, tuple] = {}
+_SAVE_DELAY = 0.25
+
+# load_workbook keyword arguments per (data_only, read_only). External links are only
+# skipped for read-only loads, since editable workbooks get saved back to disk
+_LOAD_KW = {
+    (data_only, read_only): {"read_only": read_only, "data_only": data_only,
+                             "keep_links": not read_only, "keep_vba": False}
+    for data_only in (False, True) for read_only in (False, True)
+}
+
+# Column letters by index ("A" at 1) for every column a sheet can have
+_COL_LETTERS = [""] + [get_column_letter(idx) for idx in range(1, 16385)]
+
+# Style of a cell that has never been formatted
+_DEFAULT_STYLE = StyleArray()
+
+# Package parts and patterns used to edit a single cell in the sheet XML, see _patch_cell_xml
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_REL_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+_XML_ROW_REF_RE = re.compile(rb'<row\b[^>]*?\br="(\d+)"')
+_XML_ROW_NO_REF_RE = re.compile(rb'<row\b(?![^>]*\br=")')
+_XML_CELL_RE = re.compile(rb'<c\b([^>]*?)(?:/>|>(.*?)</c>)', re.S)
+_XML_CELL_REF_RE = re.compile(rb'\br="([A-Z]+)\d+"')
+_XML_STYLE_RE = re.compile(rb'\ss="\d+"')
+_XML_SPANS_RE = re.compile(rb'\sspans="[^"]*"')
+_XML_DIMENSION_RE = re.compile(rb'<dimension ref="([^"]+)"\s*/>')
+_XML_MERGE_REF_RE = re.compile(rb'<mergeCell ref="([^"]+)"')
+_XML_MERGE_COUNT_RE = re.compile(rb'<mergeCells\b[^>]*\bcount="([0-9]+)"')
+_XML_SHARED_FORMULA_RE = re.compile(rb'<f\b[^>]*\bt="(?:shared|array)"')
+
+# Values a cell can hold as they are; bool is covered by int
+_CELL_VALUE_TYPES = (str, int, float, datetime.date, datetime.time)
+
+def _write_excel_value(cell: Cell, value: Any) -> None:
+    """Store a write_excel value on a regular or write-only cell with its number format."""
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        cell.value = value
+        cell.number_format = 'yyyy-mm-dd'
+    elif isinstance(value, (int, float)):
+        cell.value = value
+        cell.number_format = '#,##0.00' if isinstance(value, float) else '#,##0'
+    else:
+        cell.value = str(value) if value is not None else ""
+
+def _write_typed_int(cell: Cell, value: int) -> None:
+    cell.value = value
+    cell.number_format = '#,##0'
+
+def _write_typed_float(cell: Cell, value: float) -> None:
+    cell.value = value
+    cell.number_format = '#,##0.00' if value % 1 != 0 else '#,##0'
+
+def _write_typed_bool(cell: Cell, value: bool) -> None:
+    cell.value = value
+
+def _write_typed_str(cell: Cell, value: str) -> None:
+    cell.value = value
+
+def _write_typed_datetime(cell: Cell, value: datetime.datetime) -> None:
+    cell.value = value
+    cell.number_format = 'yyyy-mm-dd hh:mm:ss'
+
+def _write_typed_date(cell: Cell, value: datetime.date) -> None:
+    cell.value = value
+    cell.number_format = 'yyyy-mm-dd'
+
+def _write_typed_none(cell: Cell, value: None) -> None:
+    cell.value = ""
+
+def _write_typed_fallback(cell: Cell, value: Any) -> None:
+    """Handle subclasses of the dispatched types (and anything else) by isinstance checks."""
+    if isinstance(value, datetime.datetime):
+        _write_typed_datetime(cell, value)
+    elif isinstance(value, datetime.date):
+        _write_typed_date(cell, value)
+    elif isinstance(value, bool):
+        _write_typed_bool(cell, value)
+    elif isinstance(value, int):
+        _write_typed_int(cell, value)
+    elif isinstance(value, float):
+        _write_typed_float(cell, value)
+    else:
+        cell.value = str(value)
+
+# write_data_to_excel value handlers, dispatched on the exact type of the value
+_TYPED_WRITERS: Dict[type, Callable[[Cell, Any], None]] = {
+    int: _write_typed_int,
+    float: _write_typed_float,
+    bool: _write_typed_bool,
+    str: _write_typed_str,
+    datetime.datetime: _write_typed_datetime,
+    datetime.date: _write_typed_date,
+    type(None): _write_typed_none,
+}
+
+def _write_typed_value(cell: Cell, value: Any) -> None:
+    """Store a write_data_to_excel value on a regular or write-only cell with its number format."""
+    _TYPED_WRITERS.get(type(value), _write_typed_fallback)(cell, value)
+
+def _iter_values(worksheet: Worksheet, min_row: int, max_row: int,
+                 min_col: int, max_col: int) -> Generator[List[Any], None, None]:
+    """Yield rows of values from an editable worksheet's cell map without creating empty cells."""
+    cells_get = worksheet._cells.get
+    columns = range(min_col, max_col + 1)
+    for row in range(min_row, max_row + 1):
+        row_data = []
+        for col in columns:
+            cell = cells_get((row, col))
+            row_data.append(None if cell is None else cell.value)
+        yield row_data
+
+def _collect_values(worksheet: Worksheet, min_row: int, max_row: int,
+                    min_col: int, max_col: int) -> List[List[Any]]:
+    """Read a block of values from an editable worksheet, with "" for empty cells."""
+    return [["" if value is None else value for value in row]
+            for row in _iter_values(worksheet, min_row, max_row, min_col, max_col)]
+
+def _cell_position(coordinate: str) -> tuple[int, int]:
+    """Row and column of a single cell reference such as 'A1' or '$A$1'."""
+    column, row_idx = coordinate_from_string(coordinate)
+    return row_idx, column_index_from_string(column)
+
+def _apply_cell_edits(workbook: openpyxl.Workbook, sheet_name: str,
+                      edits: List[tuple], create_sheet: bool = True) -> None:
+    """
+    Set (row, column, value) edits on a sheet of an editable workbook, all or nothing.
+    
+    A workbook waiting for a deferred save also holds edits that were already reported as
+    done, so it can neither be saved nor dropped after a failed edit. Instead the cells
+    touched here, and the sheet if it was created here, are put back before the error
+    is raised.
+    """
+    created = sheet_name not in workbook.sheetnames
+    if created and not create_sheet:
+        raise ValueError(f"Sheet '{sheet_name}' not found. Available sheets: {workbook.sheetnames}")
+    worksheet = workbook.create_sheet(sheet_name) if created else workbook[sheet_name]
+    cells = worksheet._cells
+    # (row, column) of each touched cell with its previous state, None if it did not exist.
+    # Merged cells reject any value, so they never need restoring
+    touched = []
+    try:
+        for row_idx, col_idx, value in edits:
+            cell = cells.get((row_idx, col_idx))
+            if cell is None:
+                touched.append(((row_idx, col_idx), None))
+            elif not isinstance(cell, MergedCell):
+                style = None if cell._style is None else StyleArray(cell._style)
+                touched.append(((row_idx, col_idx), (cell, cell._value, cell.data_type, style)))
+            worksheet.cell(row=row_idx, column=col_idx).value = value
+    except Exception:
+        for position, state in reversed(touched):
+            if state is None:
+                cells.pop(position, None)
+                continue
+            cell, value, data_type, style = state
+            cell._value, cell.data_type, cell._style = value, data_type, style
+        if created:
+            workbook.remove(worksheet)
+        raise
+
+def _has_dimension(worksheet: ReadOnlyWorksheet) -> bool:
+    """Whether a read-only worksheet's <dimension> tag gives a usable extent."""
+    return not (worksheet.max_row is None or worksheet.max_column is None or
+                (worksheet.max_row == 1 and worksheet.max_column == 1))
+
+def _size_worksheet(worksheet: Worksheet) -> None:
+    """
+    Make sure a read-only worksheet knows its used area. The <dimension> tag is optional and
+    some writers emit a bare A1:A1 for every sheet, so such sheets are sized with one scan.
+    """
+    if isinstance(worksheet, ReadOnlyWorksheet) and not _has_dimension(worksheet):
+        worksheet.reset_dimensions()
+        max_row = max_col = 1
+        for row in worksheet.rows:
+            if row:
+                max_row = row[-1].row
+                max_col = max(max_col, row[-1].column)
+        worksheet._max_row, worksheet._max_column = max_row, max_col
+
+def _sheet_parts(archive: zipfile.ZipFile, workbook: ET.Element) -> List[tuple[str, str]]:
+    """Names and package part paths of a workbook's sheets, in tab order."""
+    rels = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels.iter(_NS_PKG_REL)}
+    parts = []
+    for sheet in workbook.iter(f"{_NS_MAIN}sheet"):
+        target = targets[sheet.get(_NS_REL_ID)]
+        parts.append((sheet.get("name"), target.lstrip("/") if target.startswith("/") else f"xl/{target}"))
+    return parts
+
+def _sheet_xml_extent(sheet_xml: bytes) -> tuple[int, int]:
+    """
+    Last row and column of a sheet, taken from its <dimension> ref. Sheets without one, or
+    with the A1 placeholder some writers emit, are sized from their cell and merge references.
+    """
+    dimension = _XML_DIMENSION_RE.search(sheet_xml)
+    ref = dimension.group(1).decode() if dimension else None
+    if ref not in (None, "A1", "A1:A1") or b'<c ' not in sheet_xml:
+        min_col, min_row, max_col, max_row = range_boundaries(ref or "A1")
+        return max_row or min_row, max_col or min_col
+    max_row = max((int(row) for row in _XML_ROW_REF_RE.findall(sheet_xml)), default=1)
+    max_col = max((column_index_from_string(ref.decode()) for ref in _XML_CELL_REF_RE.findall(sheet_xml)),
+                  default=1)
+    # openpyxl counts the cells covered by merged ranges too
+    for ref in _XML_MERGE_REF_RE.findall(sheet_xml):
+        _, _, merge_max_col, merge_max_row = range_boundaries(ref.decode())
+        max_row, max_col = max(max_row, merge_max_row), max(max_col, merge_max_col)
+    return max_row, max_col
+
+def _cell_xml(coordinate: str, style: bytes, value: str) -> bytes:
+    """Serialize a <c> element holding a string bound the way openpyxl binds it."""
+    ref = f'<c r="{coordinate}"'.encode() + style
+    if value == "":
+        return ref + b'/>'
+    text = escape(value).encode()
+    if len(value) > 1 and value.startswith("="):
+        return ref + b'><f>' + text[1:] + b'</f></c>'
+    if value in ERROR_CODES:
+        return ref + b' t="e"><v>' + text + b'</v></c>'
+    space = b' xml:space="preserve"' if value != value.strip() else b''
+    return ref + b' t="inlineStr"><is><t' + space + b'>' + text + b'</t></is></c>'
+
+def _set_sheet_xml_cell(sheet_xml: bytes, row_idx: int, col_idx: int, value: str,
+                        has_calc_chain: bool) -> Optional[bytes]:
+    """
+    Return the sheet XML with one cell set to value, or None when the sheet cannot be
+    edited safely at this level (rows or cells without references, shared or array
+    formulas, a formula listed in the calculation chain being replaced by a value).
+    """
+    if _XML_ROW_NO_REF_RE.search(sheet_xml):
+        return None
+    coordinate = f"{_COL_LETTERS[col_idx]}{row_idx}"
+    row = re.search(rb'<row\b[^>]*?\br="%d"[^>]*?(/?)>' % row_idx, sheet_xml)
+    
+    if row is None:
+        # New row, placed before the first row below it
+        new_row = f'<row r="{row_idx}">'.encode() + _cell_xml(coordinate, b'', value) + b'</row>'
+        for other in _XML_ROW_REF_RE.finditer(sheet_xml):
+            if int(other.group(1)) > row_idx:
+                sheet_xml = sheet_xml[:other.start()] + new_row + sheet_xml[other.start():]
+                break
+        else:
+            if b'</sheetData>' in sheet_xml:
+                sheet_xml = sheet_xml.replace(b'</sheetData>', new_row + b'</sheetData>', 1)
+            elif b'<sheetData/>' in sheet_xml:
+                sheet_xml = sheet_xml.replace(b'<sheetData/>', b'<sheetData>' + new_row + b'</sheetData>', 1)
+            else:
+                return None
+    elif row.group(1):
+        # Empty self-closing row
+        row_tag = _XML_SPANS_RE.sub(b'', row.group(0)[:-2])
+        new_row = row_tag + b'>' + _cell_xml(coordinate, b'', value) + b'</row>'
+        sheet_xml = sheet_xml[:row.start()] + new_row + sheet_xml[row.end():]
+    else:
+        new_cell_is_formula = len(value) > 1 and value.startswith("=")
+        content_end = sheet_xml.index(b'</row>', row.end())
+        insert_at = content_end
+        for cell in _XML_CELL_RE.finditer(sheet_xml, row.end(), content_end):
+            ref = _XML_CELL_REF_RE.search(cell.group(1))
+            if ref is None:
+                return None
+            cell_col = column_index_from_string(ref.group(1).decode())
+            if cell_col == col_idx:
+                # Existing cell: keep its style, drop its value, type and metadata
+                old_content = cell.group(2) or b''
+                if _XML_SHARED_FORMULA_RE.search(old_content):
+                    return None
+                if has_calc_chain and b'<f' in old_content and not new_cell_is_formula:
+                    return None
+                style = _XML_STYLE_RE.search(cell.group(1))
+                new_cell = _cell_xml(coordinate, style.group(0) if style else b'', value)
+                return _extend_dimension(sheet_xml[:cell.start()] + new_cell + sheet_xml[cell.end():],
+                                         row_idx, col_idx)
+            if cell_col > col_idx:
+                insert_at = cell.start()
+                break
+        # New cell in an existing row, the row's column span hint no longer applies
+        row_tag = _XML_SPANS_RE.sub(b'', row.group(0))
+        sheet_xml = (sheet_xml[:row.start()] + row_tag + sheet_xml[row.end():insert_at]
+                     + _cell_xml(coordinate, b'', value) + sheet_xml[insert_at:])
+    return _extend_dimension(sheet_xml, row_idx, col_idx)
+
+def _extend_dimension(sheet_xml: bytes, row_idx: int, col_idx: int) -> bytes:
+    """Grow the sheet's <dimension> ref so that it includes the given cell."""
+    dimension = _XML_DIMENSION_RE.search(sheet_xml)
+    if dimension is None:
+        return sheet_xml
+    try:
+        min_col, min_row, max_col, max_row = range_boundaries(dimension.group(1).decode())
+    except ValueError:
+        return sheet_xml
+    if None in (min_col, min_row, max_col, max_row):
+        return sheet_xml
+    ref = (f"{_COL_LETTERS[min(min_col, col_idx)]}{min(min_row, row_idx)}:"
+           f"{_COL_LETTERS[max(max_col, col_idx)]}{max(max_row, row_idx)}")
+    return sheet_xml[:dimension.start()] + f'<dimension ref="{ref}"/>'.encode() + sheet_xml[dimension.end():]
+
+def _calamine_value(value: Any) -> Any:
+    """Map a calamine cell value onto what openpyxl would return for it."""
+    if value == "":
+        return None
+    if type(value) is float and value.is_integer():
+        # Whole numbers are stored as "1", which openpyxl reads back as an int
+        return int(value)
+    if type(value) is datetime.date:
+        return datetime.datetime(value.year, value.month, value.day)
+    return value
+
+def _calamine_sheet(file_path: str, sheet_name: str) -> tuple[List[list], tuple[int, int, int, int]]:
+    """
+    Read a sheet's values with calamine. Returns the rows starting at A1 and the sheet's
+    used area as (min_col, min_row, max_col, max_row).
+    """
+    workbook = CalamineWorkbook.from_path(file_path)
+    if sheet_name not in workbook.sheet_names:
+        raise ValueError(f"Sheet '{sheet_name}' not found. Available sheets: {workbook.sheet_names}")
+    sheet = workbook.get_sheet_by_name(sheet_name)
+    rows = sheet.to_python(skip_empty_area=False)
+    start_row, start_col = sheet.start or (0, 0)
+    return rows, (start_col + 1, start_row + 1,
+                  max(max((len(row) for row in rows), default=1), 1), max(len(rows), 1))
+
+def _calamine_rows(rows: List[list], min_row: int, max_row: int,
+                   min_col: int, max_col: int) -> Generator[List[Any], None, None]:
+    """Yield a block of calamine rows as openpyxl values, with None beyond the stored data."""
+    for row_idx in range(min_row - 1, max_row):
+        row = rows[row_idx] if row_idx < len(rows) else ()
+        yield [_calamine_value(row[col_idx]) if col_idx < len(row) else None
+               for col_idx in range(min_col - 1, max_col)]
+
+def _rgb(color: Any) -> Optional[str]:
+    """ARGB string of an explicit colour; theme and indexed colours have none and give None."""
+    return color.rgb if color is not None and color.type == "rgb" else None
+
+def _column_lengths(data: List[List[Any]]) -> List[int]:
+    """Length of the longest value in each column of a block of rows, ignoring None."""
+    return [max((len(str(value)) for value in column if value is not None), default=0)
+            for column in zip_longest(*data)]
+
+@contextlib.contextmanager
+def _file_lock(file_path: str) -> Generator[None, None, None]:
+    """Hold the lock shared by all tool calls on a file, whatever path or symlink names it."""
+    real_path = os.path.realpath(file_path)
+    with _WB_LOCK:
+        entry = _FILE_LOCKS.setdefault(real_path, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        closing = ()
+        with _WB_LOCK:
+            entry[1] -= 1
+            if not entry[1]:
+                del _FILE_LOCKS[real_path]
+                closing = _CLOSE_LATER.pop(real_path, ())
+        for workbook in closing:
+            workbook.close()
+
+@contextlib.asynccontextmanager
+async def _file_queue(file_path: str):
+    """Hold the event loop lock that tool calls on a file wait on before taking a thread."""
+    real_path = os.path.realpath(file_path)
+    # Only touched from the event loop thread, so no other lock is needed
+    entry = _FILE_QUEUES.setdefault(real_path, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if not entry[1]:
+            del _FILE_QUEUES[real_path]
+
+def _flush_pending(file_path: str, failed_only: bool = False) -> bool:
+    """
+    Save a file's pending edits now, if it has any. The caller holds the file's lock.
+    
+    The edits stay pending if the save fails, so they are never lost after being reported
+    as done; the error is raised to the caller and the save is retried by the next call.
+    
+    Args:
+        file_path: Path of the edited file
+        failed_only: Only retry a deferred save that has already failed once
+    
+    Returns:
+        Whether there was anything to save.
+    """
+    real_path = os.path.realpath(file_path)
+    with _WB_LOCK:
+        pending = _PENDING_SAVES.get(real_path)
+    if pending is None or (failed_only and pending[3] is None):
+        return False
+    workbook, timer, save, _ = pending
+    timer.cancel()
+    try:
+        save()
+    except Exception as e:
+        with _WB_LOCK:
+            _PENDING_SAVES[real_path] = (workbook, timer, save, e)
+        raise
+    with _WB_LOCK:
+        _PENDING_SAVES.pop(real_path, None)
+    return True
+
+def _in_thread(func: Optional[Callable[..., str]] = None, *,
+               flush_pending: Optional[bool] = True) -> Callable[..., Any]:
+    """
+    Turn a blocking tool body into a coroutine that runs it in a worker thread.
+    
+    openpyxl loads and saves are synchronous, so running them on the event loop would stall
+    every other request. Calls on the same file still run one at a time because they share
+    cached workbook objects; they wait for their turn on the event loop, so the thread pool
+    stays free for calls on other files. Deferred edits to the file are saved first so that
+    the tool sees them on disk. With flush_pending False, only a deferred save that already
+    failed is retried, so its error reaches the client; with None, the tool handles pending
+    saves itself.
+    """
+    if func is None:
+        return functools.partial(_in_thread, flush_pending=flush_pending)
+    
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        file_path = kwargs.get("file_path", args[0] if args else None)
+        if file_path is None:
+            return await asyncio.to_thread(func, *args, **kwargs)
+        
+        def locked_call():
+            with _file_lock(file_path):
+                if flush_pending is not None:
+                    try:
+                        _flush_pending(file_path, failed_only=not flush_pending)
+                    except Exception as e:
+                        logger.exception("Saving pending edits to %s failed", file_path)
+                        return _dump({"error": f"Saving pending edits failed: {e}"}, pretty=False)
+                return func(*args, **kwargs)
+        async with _file_queue(file_path):
+            return await asyncio.to_thread(locked_call)
+    return wrapper
+
 # Create the FastMCP server instance
 mcp = FastMCP("excel-server", host="0.0.0.0", port=PORT)
 
@@ -42,78 +543,72 @@ class ExcelFastMCPServer:
         @self.mcp.tool(name="health_check")
         async def health_check() -> str:
             """Health check endpoint for monitoring."""
-            return json.dumps({
+            return _dump({
                 "status": "healthy",
                 "server": "excel-fastmcp-server",
                 "timestamp": datetime.datetime.now().isoformat(),
                 "port": PORT
-            }, indent=2)
+            })
         
         @self.mcp.tool(name="read_excel")
-        async def read_excel(file_path: str, sheet_name: str, range: Optional[str] = None) -> str:
+        @_in_thread
+        def read_excel(file_path: str, sheet_name: str, range: Optional[str] = None,
+                             max_rows: int = 10000, page: int = 0) -> str:
             try:
                 # Add validation for file extension
                 if not file_path.lower().endswith(('.xlsx', '.xls', '.xlsm')):
                     raise ValueError("Invalid file format. Only Excel files (.xlsx, .xls, .xlsm) are supported")
 
-                workbook, worksheet = self._get_workbook_and_sheet(file_path, sheet_name)
-                
-                # Add validation for range format
-                if range and not re.match(r'^[A-Z]+[0-9]+:[A-Z]+[0-9]+$|^[A-Z]+[0-9]+$', range):
-                    raise ValueError("Invalid range format. Use format like 'A1:B10' or 'A1'")
+                # Add validation for pagination
+                if max_rows < 1 or page < 0:
+                    raise ValueError("max_rows must be at least 1 and page cannot be negative")
+
+                # Reuse an already parsed editable workbook if there is one, otherwise read-only
+                # mode streams the sheet XML instead of building the full cell model
+                workbook = self._cached_workbook(file_path)
+                if workbook is not None and sheet_name in workbook.sheetnames:
+                    worksheet = workbook[sheet_name]
+                else:
+                    workbook, worksheet = self._get_workbook_and_sheet(file_path, sheet_name, read_only=True)
                 
-                # Improve empty cell handling
                 if range:
-                    cells = worksheet[range]
+                    # range_boundaries validates the reference while parsing it; whole
+                    # row/column references such as 'A:B' leave some bounds unset
                     try:
-                        if isinstance(cells, tuple):
-                            data = [[cell.value if cell.value is not None else "" for cell in row] for row in cells]
-                        elif isinstance(cells, Cell):
-                            data = [[cells.value if cells.value is not None else ""]]
-                        else:
-                            # Defensive processing for other cell types
-                            if hasattr(cells, '__iter__'):
-                                data = [[cell.value if cell.value is not None else "" for cell in cells]]
-                            else:
-                                data = [[str(cells)]]  # Fallback
-                    except Exception as range_error:
-                        # If something goes wrong in range processing, fall back to basic reading
-                        import traceback
-                        return json.dumps({
-                            "error": f"Range processing error: {str(range_error)}",
-                            "error_type": type(range_error).__name__,
-                            "traceback": traceback.format_exc(),
-                            "file_path": file_path,
-                            "sheet_name": sheet_name,
-                            "range": range
-                        })
-                    
-                    # Extract range boundaries for proper reporting
-                    if ':' in range:
-                        start_cell, end_cell = range.split(':')
-                        start_col, start_row = coordinate_from_string(start_cell)  # Note: coordinate_from_string returns (col, row)
-                        end_col, end_row = coordinate_from_string(end_cell)
-                        min_row = start_row
-                        max_row = end_row
-                        min_col = column_index_from_string(start_col)
-                        max_col = column_index_from_string(end_col)
-                    else:
-                        # Single cell
-                        single_col, single_row = coordinate_from_string(range)  # Note: coordinate_from_string returns (col, row)
-                        min_row = max_row = single_row
-                        min_col = max_col = column_index_from_string(single_col)
+                        bounds = range_boundaries(range)
+                    except ValueError:
+                        bounds = (None,)
+                    if None in bounds:
+                        raise ValueError("Invalid range format. Use format like 'A1:B10' or 'A1'")
+                    # The corners may be given in either order
+                    min_col, min_row, max_col, max_row = bounds
+                    min_col, max_col = min(min_col, max_col), max(min_col, max_col)
+                    min_row, max_row = min(min_row, max_row), max(min_row, max_row)
                 else:
                     # Read all rows without skipping - maintain exact row correspondence
+                    _size_worksheet(worksheet)
                     min_row = worksheet.min_row
                     max_row = worksheet.max_row
                     min_col = worksheet.min_column
                     max_col = worksheet.max_column
-                    data = []
-                    for row in worksheet.iter_rows(min_row=min_row, max_row=max_row, 
-                                                min_col=min_col, max_col=max_col):
-                        row_data = [cell.value if cell.value is not None else "" for cell in row]
-                        data.append(row_data)  # Don't skip empty rows to maintain row indexing
-                
+
+                # Only the requested page of rows is materialized
+                page_min_row = min_row + page * max_rows
+                page_max_row = min(max_row, page_min_row + max_rows - 1)
+
+                data = []
+                if page_min_row <= max_row and not workbook.read_only:
+                    data = _collect_values(worksheet, page_min_row, page_max_row, min_col, max_col)
+                elif page_min_row <= max_row:
+                    # values_only yields plain tuples, no Cell objects are created
+                    for row in worksheet.iter_rows(min_row=page_min_row, max_row=page_max_row,
+                                                   min_col=min_col, max_col=max_col, values_only=True):
+                        data.append(["" if value is None else value for value in row])  # Don't skip empty rows to maintain row indexing
+                    # The streaming reader stops at the last stored row, pad the rest of the page
+                    # (a while loop, since the `range` argument shadows the builtin here)
+                    while len(data) < page_max_row - page_min_row + 1:
+                        data.append([""] * (max_col - min_col + 1))
+
                 # Safe calculation of dimensions and total cells
                 try:
                     rows_count = len(data) if data else 0
@@ -136,27 +631,33 @@ class ExcelFastMCPServer:
                     dimensions_str = "Error calculating dimensions"
                     total_cells = 0
                 
-                return json.dumps({
+                return _dump({
                     "file_path": file_path,
                     "sheet_name": sheet_name,
-                    "range_read": range if range else f"A{min_row}:{get_column_letter(max_col)}{max_row}",
+                    "range_read": range if range else f"A{min_row}:{_COL_LETTERS[max_col]}{max_row}",
                     "data": data,
                     "dimensions": dimensions_str,
                     "total_cells": total_cells,
-                    "row_offset": min_row - 1  # Add row offset info for easier indexing
-                }, indent=2)
+                    "row_offset": page_min_row - 1,  # Add row offset info for easier indexing
+                    "page": page,
+                    "has_more": page_max_row < max_row,
+                    "total_rows": max_row - min_row + 1
+                })
             except Exception as e:
-                import traceback
-                return json.dumps({
+                logger.exception("read_excel failed")
+                error = {
                     "error": str(e),
                     "error_type": type(e).__name__,
-                    "traceback": traceback.format_exc(),
                     "file_path": file_path,
                     "sheet_name": sheet_name
-                })
+                }
+                if DEBUG_TRACEBACKS:
+                    error["traceback"] = traceback.format_exc()
+                return _dump(error, pretty=False)
 
         @self.mcp.tool(name="write_excel")
-        async def write_excel(file_path: str, sheet_name: str, data: List[List[Any]], 
+        @_in_thread
+        def write_excel(file_path: str, sheet_name: str, data: List[List[Any]], 
                             start_cell: str = "A1", preserve_formatting: bool = True) -> str:
             try:
                 # Validate file extension
@@ -164,90 +665,82 @@ class ExcelFastMCPServer:
                     raise ValueError("Invalid file format. Only Excel files are supported")
 
                 # Validate start_cell format
-                if not re.match(r'^[A-Z]+[0-9]+$', start_cell):
+                if not _CELL_RE.fullmatch(start_cell):
                     raise ValueError("Invalid start_cell format. Use format like 'A1'")
 
-                workbook, worksheet = self._get_workbook_and_sheet(file_path, sheet_name, create_sheet=True)
-                
-                start_row = worksheet[start_cell].row
-                start_col = worksheet[start_cell].column
+                # Parse the coordinate directly rather than looking the cell up on the sheet
+                start_row, start_col = coordinate_to_tuple(start_cell)
+
+                if start_cell == "A1" and not os.path.exists(file_path):
+                    # New file: nothing to preserve, stream rows through a write-only workbook
+                    self._stream_new_workbook(file_path, sheet_name, data, _write_excel_value, autofit=True)
+                else:
+                    workbook, worksheet = self._get_workbook_and_sheet(file_path, sheet_name, create_sheet=True, for_write=True)
                 
-                # Backup existing formatting if needed
-                if preserve_formatting:
-                    existing_formats = {}
-                    for row_idx, row_data in enumerate(data):
-                        for col_idx, _ in enumerate(row_data):
-                            cell = worksheet.cell(row=start_row + row_idx, column=start_col + col_idx)
-                            existing_formats[(row_idx, col_idx)] = {
-                                'font': cell.font,
-                                'fill': cell.fill,
-                                'border': cell.border,
-                                'alignment': cell.alignment
-                            }
+                    # Backup existing formatting if needed. Only cells already on the sheet can carry
+                    # a style, so the scan is limited to the used area and skips unstyled cells
+                    saved_styles = {}
+                    if preserve_formatting:
+                        existing_cells = worksheet._cells
+                        last_row = min(start_row + len(data) - 1, worksheet.max_row)
+                        for row in range(start_row, last_row + 1):
+                            last_col = min(start_col + len(data[row - start_row]) - 1, worksheet.max_column)
+                            for col in range(start_col, last_col + 1):
+                                cell = existing_cells.get((row, col))
+                                if cell is not None and cell.has_style:
+                                    saved_styles[row, col] = StyleArray(cell._style)
 
-                # Write data with type checking
-                for row_idx, row_data in enumerate(data):
-                    for col_idx, value in enumerate(row_data):
-                        cell = worksheet.cell(row=start_row + row_idx, column=start_col + col_idx)
+                    # Write data with type checking
+                    for row_idx, row_data in enumerate(data):
+                        for col_idx, value in enumerate(row_data):
+                            row, col = start_row + row_idx, start_col + col_idx
+                            cell = worksheet.cell(row=row, column=col)
                         
-                        # Handle different data types
-                        if isinstance(value, (datetime.date, datetime.datetime)):
-                            cell.value = value
-                            cell.number_format = 'yyyy-mm-dd'
-                        elif isinstance(value, (int, float)):
-                            cell.value = value
-                            cell.number_format = '#,##0.00' if isinstance(value, float) else '#,##0'
-                        else:
-                            cell.value = str(value) if value is not None else ""
-
-                        # Restore formatting if needed
-                        if preserve_formatting and (row_idx, col_idx) in existing_formats:
-                            fmt = existing_formats[(row_idx, col_idx)]
-                            cell.font = fmt['font']
-                            cell.fill = fmt['fill']
-                            cell.border = fmt['border']
-                            cell.alignment = fmt['alignment']
-
-                # Auto-adjust column widths
-                for col_idx in range(len(data[0]) if data else 0):
-                    col_letter = get_column_letter(start_col + col_idx)
-                    max_length = 0
-                    for row_idx in range(len(data)):
-                        cell = worksheet.cell(row=start_row + row_idx, column=start_col + col_idx)
-                        try:
-                            max_length = max(max_length, len(str(cell.value)))
-                        except:
-                            pass
-                    worksheet.column_dimensions[col_letter].width = min(max_length + 2, 50)  # Cap at 50
+                            # Handle different data types
+                            _write_excel_value(cell, value)
 
-                workbook.save(file_path)
+                            # Restore formatting if needed, keeping the number format chosen above
+                            saved = saved_styles.get((row, col))
+                            if saved is not None:
+                                num_fmt_id = cell._style.numFmtId if cell._style is not None else 0
+                                saved.numFmtId = num_fmt_id
+                                cell._style = saved
+
+                    # Auto-adjust column widths
+                    for col_idx, max_length in enumerate(_column_lengths(data)):
+                        col_letter = _COL_LETTERS[start_col + col_idx]
+                        worksheet.column_dimensions[col_letter].width = min(max_length + 2, 50)  # Cap at 50
+
+                    self._save_workbook(workbook, file_path)
                 
-                return json.dumps({
+                return _dump({
                     "status": "success",
                     "file_path": file_path,
                     "sheet_name": sheet_name,
                     "rows_written": len(data),
                     "columns_written": len(data[0]) if data else 0,
                     "start_cell": start_cell,
-                    "end_cell": f"{get_column_letter(start_col + len(data[0]) - 1)}{start_row + len(data) - 1}",
+                    "end_cell": f"{_COL_LETTERS[start_col + len(data[0]) - 1]}{start_row + len(data) - 1}",
                     "cells_written": sum(len(row) for row in data)
-                }, indent=2)
+                })
             except Exception as e:
-                return json.dumps({
+                self._evict_workbook(file_path)
+                return _dump({
                     "error": str(e),
                     "error_type": type(e).__name__,
                     "file_path": file_path,
                     "sheet_name": sheet_name
-                })
+                }, pretty=False)
 
         @self.mcp.tool(name="create_workbook")
-        async def create_workbook(file_path: str, sheet_names: List[str] = None) -> str:
+        @_in_thread
+        def create_workbook(file_path: str, sheet_names: List[str] = None) -> str:
             """Create a new, empty Excel workbook."""
             try:
                 if sheet_names is None:
                     sheet_names = ["Sheet1"]
                     
-                if Path(file_path).exists():
+                if os.path.exists(file_path):
                     raise FileExistsError(f"File already exists at '{file_path}'. Cannot create new workbook.")
                 
                 workbook = openpyxl.Workbook()
@@ -256,65 +749,72 @@ class ExcelFastMCPServer:
                     workbook.create_sheet(sheet_name, index=i)
                 
                 workbook.save(file_path)
-                return json.dumps({
+                return _dump({
                     "status": "success", "file_path": file_path, "sheets_created": sheet_names
-                }, indent=2)
+                })
             except Exception as e:
-                return json.dumps({"error": str(e)})
+                return _dump({"error": str(e)}, pretty=False)
 
         @self.mcp.tool(name="list_sheets")
-        async def list_sheets(file_path: str) -> str:
+        @_in_thread
+        def list_sheets(file_path: str) -> str:
             """List the names of all sheets in an Excel workbook."""
             try:
                 workbook, _ = self._get_workbook_and_sheet(file_path)
-                return json.dumps({
+                return _dump({
                     "file_path": file_path, "sheets": workbook.sheetnames
-                }, indent=2)
+                })
             except Exception as e:
-                return json.dumps({"error": str(e)})
+                return _dump({"error": str(e)}, pretty=False)
 
         @self.mcp.tool(name="autofit_columns")
-        async def autofit_columns(file_path: str, sheet_name: str, columns: List[str] = None) -> str:
+        @_in_thread
+        def autofit_columns(file_path: str, sheet_name: str, columns: List[str] = None) -> str:
             """Automatically adjust the width of specified columns to fit the content."""
             try:
                 if columns is None:
                     columns = []
                     
-                workbook, worksheet = self._get_workbook_and_sheet(file_path, sheet_name)
+                workbook, worksheet = self._get_workbook_and_sheet(file_path, sheet_name, for_write=True)
 
                 cols_to_fit = columns
                 if not cols_to_fit:
-                    # If no columns specified, find all columns that have data
-                    cols_to_fit = {get_column_letter(c.column) for c in worksheet.columns for r in c if r.value}
-
-                for col_letter in cols_to_fit:
-                    max_length = 0
-                    for cell in worksheet[col_letter]:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = (max_length + 2)
-                    worksheet.column_dimensions[col_letter].width = adjusted_width
+                    # If no columns specified, fit all columns that have data in a single pass over raw values
+                    cols_to_fit = []
+                    for col_idx, col_values in enumerate(worksheet.iter_cols(min_row=1, max_row=worksheet.max_row,
+                                                                             values_only=True), start=1):
+                        max_length = max((len(str(value)) for value in col_values if value is not None), default=0)
+                        if max_length:
+                            col_letter = _COL_LETTERS[col_idx]
+                            worksheet.column_dimensions[col_letter].width = max_length + 2
+                            cols_to_fit.append(col_letter)
+                else:
+                    for col_letter in cols_to_fit:
+                        col_idx = column_index_from_string(col_letter)
+                        col_values = next(worksheet.iter_cols(min_row=1, max_row=worksheet.max_row,
+                                                              min_col=col_idx, max_col=col_idx, values_only=True))
+                        max_length = max((len(str(value)) for value in col_values if value is not None), default=0)
+                        worksheet.column_dimensions[col_letter].width = max_length + 2
 
-                workbook.save(file_path)
-                return json.dumps({
+                self._save_workbook(workbook, file_path)
+                return _dump({
                     "status": "success", "file_path": file_path, "sheet_name": sheet_name,
                     "columns_autofit": list(cols_to_fit)
-                }, indent=2)
+                })
             except Exception as e:
-                return json.dumps({"error": str(e)})
+                self._evict_workbook(file_path)
+                return _dump({"error": str(e)}, pretty=False)
 
         @self.mcp.tool(name="format_range")
-        async def format_range(file_path: str, sheet_name: str, start_cell: str, end_cell: str = None,
+        @_in_thread
+        def format_range(file_path: str, sheet_name: str, start_cell: str, end_cell: str = None,
                              bold: bool = False, italic: bool = False, underline: bool = False,
                              font_size: int = None, font_color: str = None, bg_color: str = None,
                              border_style: str = None, border_color: str = None, number_format: str = None,
                              alignment: str = None, wrap_text: bool = False, merge_cells: bool = False) -> str:
             """Apply comprehensive formatting to a range of cells."""
             try:
-                workbook, worksheet = self._get_workbook_and_sheet(file_path, sheet_name)
+                workbook, worksheet = self._get_workbook_and_sheet(file_path, sheet_name, for_write=True)
                 
                 range_str = start_cell if not end_cell else f"{start_cell}:{end_cell}"
                 
@@ -347,19 +847,33 @@ class ExcelFastMCPServer:
                     if wrap_text: align_kwargs['wrap_text'] = wrap_text
                     alignment_obj = Alignment(**align_kwargs)
                 
-                # Apply formatting to range
-                for cell in self._iterate_cells_in_range(worksheet, range_str):
-                    if font: cell.font = font
-                    if fill: cell.fill = fill
-                    if border: cell.border = border
-                    if alignment_obj: cell.alignment = alignment_obj
-                    if number_format: cell.number_format = number_format
+                # Apply formatting to range. Cells that start from the same style end up with the
+                # same style, so the styles are only resolved once per distinct starting StyleArray.
+                # The corners may be given in either order
+                min_col, min_row, max_col, max_row = range_boundaries(range_str)
+                min_col, max_col = min(min_col, max_col), max(min_col, max_col)
+                min_row, max_row = min(min_row, max_row), max(min_row, max_row)
+                resolved_styles = {}
+                for row in worksheet.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col):
+                    for cell in row:
+                        original = tuple(cell._style or _DEFAULT_STYLE)
+                        resolved = resolved_styles.get(original)
+                        if resolved is not None:
+                            cell._style = StyleArray(resolved)
+                            continue
+                        if font: cell.font = font
+                        if fill: cell.fill = fill
+                        if border: cell.border = border
+                        if alignment_obj: cell.alignment = alignment_obj
+                        if number_format: cell.number_format = number_format
+                        resolved_styles[original] = tuple(cell._style or _DEFAULT_STYLE)
                 
                 # Handle merging
                 if merge_cells and end_cell:
-                    worksheet.merge_cells(f"{start_cell}:{end_cell}")
+                    worksheet.merge_cells(start_row=min_row, start_column=min_col,
+                                          end_row=max_row, end_column=max_col)
                 
-                workbook.save(file_path)
+                self._save_workbook(workbook, file_path)
                 
                 formatting_applied = {
                     "bold": bold, "italic": italic, "underline": underline,
@@ -369,50 +883,40 @@ class ExcelFastMCPServer:
                     "wrap_text": wrap_text, "merge_cells": merge_cells
                 }
                 
-                return json.dumps({
+                return _dump({
                     "status": "success", "file_path": file_path, "sheet_name": sheet_name,
                     "range": range_str, "formatting_applied": formatting_applied
-                }, indent=2)
+                })
             except Exception as e:
-                return json.dumps({"error": str(e)})
+                self._evict_workbook(file_path)
+                return _dump({"error": str(e)}, pretty=False)
 
         @self.mcp.tool(name="write_data_to_excel")
-        async def write_data_to_excel(file_path: str, sheet_name: str, data: List[List[Any]], 
+        @_in_thread
+        def write_data_to_excel(file_path: str, sheet_name: str, data: List[List[Any]], 
                                     start_cell: str = "A1") -> str:
             """Write data to Excel worksheet with improved type handling."""
             try:
-                workbook, worksheet = self._get_workbook_and_sheet(file_path, sheet_name, create_sheet=True)
+                start_row, start_col_idx = coordinate_to_tuple(start_cell)
                 
-                start_row, start_col = coordinate_from_string(start_cell)
-                start_col_idx = column_index_from_string(start_col)
+                # Ensure each row is iterable
+                rows = [row_data if hasattr(row_data, '__iter__') and not isinstance(row_data, str) else [row_data]
+                        for row_data in data]
                 
-                # Write data with enhanced type checking
-                for row_idx, row_data in enumerate(data):
-                    # Ensure row_data is iterable 
-                    if not hasattr(row_data, '__iter__') or isinstance(row_data, str):
-                        row_data = [row_data]
+                if start_cell == "A1" and not os.path.exists(file_path):
+                    # New file: stream rows through a write-only workbook
+                    self._stream_new_workbook(file_path, sheet_name, rows, _write_typed_value)
+                else:
+                    workbook, worksheet = self._get_workbook_and_sheet(file_path, sheet_name, create_sheet=True, for_write=True)
                     
-                    for col_idx, value in enumerate(row_data):
-                        cell = worksheet.cell(row=start_row + row_idx, column=start_col_idx + col_idx)
-                        
-                        # Enhanced data type handling
-                        if isinstance(value, (datetime.date, datetime.datetime)):
-                            cell.value = value
-                            cell.number_format = 'yyyy-mm-dd hh:mm:ss' if isinstance(value, datetime.datetime) else 'yyyy-mm-dd'
-                        elif isinstance(value, bool):
-                            cell.value = value
-                        elif isinstance(value, (int, float)):
-                            cell.value = value
-                            if isinstance(value, float) and value % 1 != 0:
-                                cell.number_format = '#,##0.00'
-                            else:
-                                cell.number_format = '#,##0'
-                        elif value is None:
-                            cell.value = ""
-                        else:
-                            cell.value = str(value)
+                    # Write data with enhanced type handling, one dict lookup per value
+                    writers_get = _TYPED_WRITERS.get
+                    for row_idx, row_data in enumerate(rows):
+                        for col_idx, value in enumerate(row_data):
+                            cell = worksheet.cell(row=start_row + row_idx, column=start_col_idx + col_idx)
+                            writers_get(type(value), _write_typed_fallback)(cell, value)
 
-                workbook.save(file_path)
+                    self._save_workbook(workbook, file_path)
                 
                 # Safe calculations for response
                 total_rows = len(data) if data else 0
@@ -426,7 +930,7 @@ class ExcelFastMCPServer:
                 
                 end_row = start_row + total_rows - 1 if total_rows > 0 else start_row
                 end_col_idx = start_col_idx + total_cols - 1 if total_cols > 0 else start_col_idx
-                end_cell = f"{get_column_letter(end_col_idx)}{end_row}"
+                end_cell = f"{_COL_LETTERS[end_col_idx]}{end_row}"
                 
                 # Safe cell count calculation
                 total_cells = 0
@@ -436,7 +940,7 @@ class ExcelFastMCPServer:
                     else:
                         total_cells += 1
                 
-                return json.dumps({
+                return _dump({
                     "status": "success",
                     "file_path": file_path,
                     "sheet_name": sheet_name,
@@ -446,12 +950,14 @@ class ExcelFastMCPServer:
                     "end_cell": end_cell,
                     "range_written": f"{start_cell}:{end_cell}",
                     "cells_written": total_cells
-                }, indent=2)
+                })
             except Exception as e:
-                return json.dumps({"error": str(e)})
+                self._evict_workbook(file_path)
+                return _dump({"error": str(e)}, pretty=False)
 
         @self.mcp.tool(name="read_data_from_excel")
-        async def read_data_from_excel(file_path: str, sheet_name: str, start_cell: str = "A1", 
+        @_in_thread
+        def read_data_from_excel(file_path: str, sheet_name: str, start_cell: str = "A1", 
                                      end_cell: str = None, preview_only: bool = False) -> str:
             """Read data from Excel worksheet with enhanced metadata."""
             try:
@@ -461,68 +967,68 @@ class ExcelFastMCPServer:
                 if not end_cell:
                     max_row = worksheet.max_row
                     max_col = worksheet.max_column
-                    end_cell = f"{get_column_letter(max_col)}{max_row}"
+                    end_cell = f"{_COL_LETTERS[max_col]}{max_row}"
                 
                 range_str = f"{start_cell}:{end_cell}"
-                cells = worksheet[range_str]
-                
-                # Extract cell data with metadata
-                cell_data = []
-                if isinstance(cells, Cell):
-                    cells = [[cells]]
-                elif not isinstance(cells[0], tuple):
-                    cells = [cells]
-                
-                for row_idx, row in enumerate(cells):
-                    row_data = []
-                    for col_idx, cell in enumerate(row):
-                        cell_info = {
-                            "address": cell.coordinate,
-                            "value": cell.value,
-                            "data_type": str(type(cell.value).__name__),
-                            "row": cell.row,
-                            "column": cell.column,
-                            "has_style": cell.has_style
-                        }
+                min_col, min_row, max_col, max_row = range_boundaries(range_str)
+                min_col, max_col = min(min_col, max_col), max(min_col, max_col)
+                min_row, max_row = min(min_row, max_row), max(min_row, max_row)
+                if preview_only:
+                    # Limit preview data to 10 rows of 5 columns
+                    max_col = min(max_col, min_col + 4)
+                    max_row = min(max_row, min_row + 9)
+                total_rows = max_row - min_row + 1
+                total_columns = max_col - min_col + 1
+                
+                # Extract cell data with metadata as one row per cell under a shared column
+                # list; formatting is kept apart, sparse by sheet row and column, for styled cells only.
+                # Cells come from the sheet's cell map, since indexing the sheet would add every
+                # empty cell of the range to a workbook that stays cached
+                cells_get = worksheet._cells.get
+                cell_rows = []
+                formatting = {}
+                for row_idx in range(min_row, max_row + 1):
+                    for col_idx in range(min_col, max_col + 1):
+                        cell = cells_get((row_idx, col_idx))
+                        if cell is None:
+                            cell_rows.append([f"{_COL_LETTERS[col_idx]}{row_idx}", None, "NoneType",
+                                              row_idx, col_idx, False])
+                            continue
+                        value = cell.value
+                        has_style = cell.has_style
+                        cell_rows.append([cell.coordinate, value, type(value).__name__,
+                                          row_idx, col_idx, has_style])
                         
                         # Add formatting info if cell has style
-                        if cell.has_style:
-                            cell_info["formatting"] = {
-                                "font_bold": cell.font.bold,
-                                "font_size": cell.font.size,
-                                "font_color": str(cell.font.color.rgb) if cell.font.color else None,
-                                "bg_color": str(cell.fill.start_color.rgb) if cell.fill.start_color else None,
+                        if has_style:
+                            font = cell.font
+                            formatting.setdefault(row_idx, {})[col_idx] = {
+                                "font_bold": font.bold,
+                                "font_size": font.size,
+                                "font_color": _rgb(font.color),
+                                "bg_color": _rgb(cell.fill.start_color),
                                 "number_format": cell.number_format
                             }
-                        
-                        row_data.append(cell_info)
-                        
-                        # Limit preview data
-                        if preview_only and len(row_data) >= 5:
-                            break
-                    
-                    cell_data.append(row_data)
-                    
-                    # Limit preview rows
-                    if preview_only and len(cell_data) >= 10:
-                        break
                 
                 result = {
                     "file_path": file_path,
                     "sheet_name": sheet_name,
                     "range_read": range_str,
-                    "cells": cell_data,
-                    "total_rows": len(cell_data),
-                    "total_columns": len(cell_data[0]) if cell_data else 0,
+                    "columns": ["address", "value", "data_type", "row", "column", "has_style"],
+                    "rows": cell_rows,
+                    "formatting": formatting,
+                    "total_rows": total_rows,
+                    "total_columns": total_columns,
                     "preview_only": preview_only
                 }
                 
-                return json.dumps(result, indent=2, default=str)
+                return _dump(result)
             except Exception as e:
-                return json.dumps({"error": str(e)})
+                return _dump({"error": str(e)}, pretty=False)
 
         @self.mcp.tool(name="validate_formula_syntax")
-        async def validate_formula_syntax(file_path: str, sheet_name: str, cell: str, formula: str) -> str:
+        @_in_thread
+        def validate_formula_syntax(file_path: str, sheet_name: str, cell: str, formula: str) -> str:
             """Validate Excel formula syntax without applying it."""
             try:
                 workbook, worksheet = self._get_workbook_and_sheet(file_path, sheet_name)
@@ -543,52 +1049,53 @@ class ExcelFastMCPServer:
                     raise ValueError("Unbalanced parentheses in formula")
                 
                 # Check for valid cell references pattern
-                cell_ref_pattern = r'[A-Z]+[0-9]+'
-                if re.search(r'[A-Z]+[0-9]*:', clean_formula):  # Range references
-                    range_pattern = r'[A-Z]+[0-9]+:[A-Z]+[0-9]+'
-                    if not re.search(range_pattern, clean_formula):
+                if _RANGE_COLON_RE.search(clean_formula):  # Range references
+                    if not _FULL_RANGE_RE.search(clean_formula):
                         raise ValueError("Invalid range reference in formula")
                 
-                return json.dumps({
+                return _dump({
                     "status": "valid",
                     "formula": f"={clean_formula}",
                     "cell": cell,
                     "message": "Formula syntax is valid"
-                }, indent=2)
+                })
             except Exception as e:
-                return json.dumps({
+                return _dump({
                     "status": "invalid",
                     "error": str(e),
                     "formula": formula,
                     "cell": cell
-                })
+                }, pretty=False)
 
         @self.mcp.tool(name="create_worksheet")
-        async def create_worksheet(file_path: str, sheet_name: str) -> str:
+        @_in_thread
+        def create_worksheet(file_path: str, sheet_name: str) -> str:
             """Create a new worksheet in an existing workbook."""
             try:
-                workbook, _ = self._get_workbook_and_sheet(file_path, create_sheet=True)
+                workbook, _ = self._get_workbook_and_sheet(file_path, create_sheet=True, for_write=True)
                 
                 if sheet_name in workbook.sheetnames:
                     raise ValueError(f"Sheet '{sheet_name}' already exists")
                 
                 workbook.create_sheet(sheet_name)
-                workbook.save(file_path)
+                self._save_workbook(workbook, file_path)
                 
-                return json.dumps({
+                return _dump({
                     "status": "success",
                     "file_path": file_path,
                     "sheet_name": sheet_name,
                     "message": f"Worksheet '{sheet_name}' created successfully"
-                }, indent=2)
+                })
             except Exception as e:
-                return json.dumps({"error": str(e)})
+                self._evict_workbook(file_path)
+                return _dump({"error": str(e)}, pretty=False)
 
         @self.mcp.tool(name="delete_worksheet")
-        async def delete_worksheet(file_path: str, sheet_name: str) -> str:
+        @_in_thread
+        def delete_worksheet(file_path: str, sheet_name: str) -> str:
             """Delete worksheet from workbook."""
             try:
-                workbook, _ = self._get_workbook_and_sheet(file_path, create_sheet=True)
+                workbook, _ = self._get_workbook_and_sheet(file_path, create_sheet=True, for_write=True)
                 
                 if sheet_name not in workbook.sheetnames:
                     raise ValueError(f"Sheet '{sheet_name}' does not exist")
@@ -598,149 +1105,290 @@ class ExcelFastMCPServer:
                 
                 worksheet = workbook[sheet_name]
                 workbook.remove(worksheet)
-                workbook.save(file_path)
+                self._save_workbook(workbook, file_path)
                 
-                return json.dumps({
+                return _dump({
                     "status": "success",
                     "file_path": file_path,
                     "sheet_name": sheet_name,
                     "remaining_sheets": workbook.sheetnames,
                     "message": f"Worksheet '{sheet_name}' deleted successfully"
-                }, indent=2)
+                })
             except Exception as e:
-                return json.dumps({"error": str(e)})
+                self._evict_workbook(file_path)
+                return _dump({"error": str(e)}, pretty=False)
 
 
         @self.mcp.tool(name="get_workbook_metadata")
-        async def get_workbook_metadata(file_path: str, include_ranges: bool = False) -> str:
+        @_in_thread
+        def get_workbook_metadata(file_path: str, include_ranges: bool = False,
+                                  include_merged: bool = False) -> str:
             """Get metadata about workbook including sheets and ranges."""
             try:
-                workbook, _ = self._get_workbook_and_sheet(file_path)
-                
-                metadata = {
-                    "file_path": file_path,
-                    "sheet_count": len(workbook.sheetnames),
-                    "sheet_names": workbook.sheetnames,
-                    "active_sheet": workbook.active.title if workbook.active else None
-                }
-                
-                if include_ranges:
-                    sheet_info = {}
-                    for sheet_name in workbook.sheetnames:
-                        ws = workbook[sheet_name]
-                        sheet_info[sheet_name] = {
-                            "max_row": ws.max_row,
-                            "max_column": ws.max_column,
-                            "data_range": f"A1:{get_column_letter(ws.max_column)}{ws.max_row}",
-                            "merged_cells": [str(merged_range) for merged_range in ws.merged_cells.ranges],
-                            "table_count": len(ws.tables)
-                        }
-                    metadata["sheets_info"] = sheet_info
-                
-                return json.dumps(metadata, indent=2)
+                # A workbook already in memory answers directly; otherwise the package parts are
+                # read straight from the archive, with openpyxl as the fallback
+                workbook = self._cached_workbook(file_path)
+                metadata = None
+                if workbook is None:
+                    metadata = self._read_workbook_metadata(file_path, include_ranges, include_merged)
+                if metadata is None:
+                    # Merged cells and tables are only parsed by the editable model, the sheet
+                    # list is all a read-only load needs
+                    if workbook is None:
+                        workbook, _ = self._get_workbook_and_sheet(file_path, read_only=not include_ranges)
+                    
+                    metadata = {
+                        "file_path": file_path,
+                        "sheet_count": len(workbook.sheetnames),
+                        "sheet_names": workbook.sheetnames,
+                        "active_sheet": workbook.active.title if workbook.active else None
+                    }
+                    
+                    if include_ranges:
+                        sheet_info = {}
+                        for sheet_name in workbook.sheetnames:
+                            ws = workbook[sheet_name]
+                            sheet_info[sheet_name] = {
+                                "max_row": ws.max_row,
+                                "max_column": ws.max_column,
+                                "data_range": f"A1:{_COL_LETTERS[ws.max_column]}{ws.max_row}",
+                                "merged_cell_count": len(ws.merged_cells.ranges),
+                                "table_count": len(ws.tables)
+                            }
+                            if include_merged:
+                                sheet_info[sheet_name]["merged_cells"] = [
+                                    str(merged_range) for merged_range in ws.merged_cells.ranges]
+                        metadata["sheets_info"] = sheet_info
+                return _dump(metadata)
             except Exception as e:
-                return json.dumps({"error": str(e)})
+                return _dump({"error": str(e)}, pretty=False)
 
 
         @self.mcp.tool(name="find_cell_by_value")
-        async def find_cell_by_value(file_path: str, sheet_name: str, search_value: str, 
-                                   search_range: str = None, exact_match: bool = True) -> str:
+        @_in_thread
+        def find_cell_by_value(file_path: str, sheet_name: str, search_value: str, 
+                                   search_range: str = None, exact_match: bool = True,
+                                   max_matches: Optional[int] = None) -> str:
             """Find cells containing a specific value and return their addresses."""
             try:
-                workbook, worksheet = self._get_workbook_and_sheet(file_path, sheet_name)
+                if max_matches is not None and max_matches < 1:
+                    raise ValueError("max_matches must be at least 1")
                 
-                matches = []
+                # Pick the comparison once; empty cells compare as "" and are skipped
+                # outright unless that can match
+                if exact_match:
+                    is_match = search_value.__eq__
+                else:
+                    needle = search_value.lower()
+                    is_match = lambda text: needle in text.lower()
+                match_empty = is_match("")
                 
+                # An already parsed workbook is searched in memory; otherwise calamine reads the
+                # sheet when enabled, with openpyxl's streaming reader as the default
+                workbook = self._cached_workbook(file_path)
+                use_calamine = USE_CALAMINE and workbook is None and os.path.isfile(file_path)
+                if use_calamine:
+                    sheet_rows, sheet_bounds = _calamine_sheet(file_path, sheet_name)
+                else:
+                    if workbook is not None and sheet_name in workbook.sheetnames:
+                        worksheet = workbook[sheet_name]
+                    else:
+                        workbook, worksheet = self._get_workbook_and_sheet(file_path, sheet_name, read_only=True)
+                    if isinstance(worksheet, ReadOnlyWorksheet) and not match_empty \
+                            and not _has_dimension(worksheet):
+                        # Stream the rows as stored instead of sizing the sheet with a pass of
+                        # its own; only a search that can match empty cells needs the full grid
+                        worksheet.reset_dimensions()
+                    else:
+                        _size_worksheet(worksheet)
+                    sheet_bounds = (worksheet.min_column, worksheet.min_row,
+                                    worksheet.max_column, worksheet.max_row)
+                
+                # (row, column, value) of each matching cell
+                found = []
+                
+                # Search the entire worksheet unless a range is given; whole rows or columns
+                # such as 'A:B' are bounded by the sheet's used area
+                min_col, min_row, max_col, max_row = sheet_bounds
                 if search_range:
-                    cells = worksheet[search_range]
-                    if isinstance(cells, Cell):
-                        cells = [[cells]]
-                    elif not isinstance(cells[0], tuple):
-                        cells = [cells]
+                    min_col, min_row, max_col, max_row = (
+                        sheet if bound is None else bound
+                        for bound, sheet in zip(range_boundaries(search_range), sheet_bounds))
+                    # The corners may be given in either order; a streamed sheet of unknown
+                    # size has no upper bounds
+                    if max_col is not None and min_col > max_col:
+                        min_col, max_col = max_col, min_col
+                    if max_row is not None and min_row > max_row:
+                        min_row, max_row = max_row, min_row
+                sheet_min_col, sheet_min_row = sheet_bounds[:2]
+                
+                # Rows of plain values for the block; positions come from the row and column
+                # counters, so no cell objects are built or inspected during the scan
+                if use_calamine:
+                    rows = _calamine_rows(sheet_rows, min_row, max_row, min_col, max_col)
+                elif not isinstance(worksheet, ReadOnlyWorksheet):
+                    # A cached editable sheet is read from its cell map, as iter_rows would add
+                    # every empty cell of the block to it
+                    rows = _iter_values(worksheet, min_row, max_row, min_col, max_col)
                 else:
-                    # Search entire worksheet
-                    min_row = worksheet.min_row
-                    max_row = worksheet.max_row
-                    min_col = worksheet.min_column
-                    max_col = worksheet.max_column
-                    cells = worksheet.iter_rows(min_row=min_row, max_row=max_row, 
-                                              min_col=min_col, max_col=max_col)
+                    rows = worksheet.iter_rows(min_row=min_row, max_row=max_row,
+                                               min_col=min_col, max_col=max_col, values_only=True)
                 
-                for row in cells:
-                    if not isinstance(row, tuple):
-                        row = [row]
-                    for cell in row:
-                        cell_value = str(cell.value) if cell.value is not None else ""
-                        
-                        if exact_match:
-                            match_found = cell_value == search_value
-                        else:
-                            match_found = search_value.lower() in cell_value.lower()
+                for row_idx, row in enumerate(rows, start=min_row):
+                    for col_idx, value in enumerate(row, start=min_col):
+                        if value is None:
+                            if not match_empty:
+                                continue
+                        elif not is_match(value if type(value) is str else str(value)):
+                            continue
                         
-                        if match_found:
-                            matches.append({
-                                "cell_address": cell.coordinate,
-                                "row": cell.row,
-                                "column": cell.column,
-                                "column_letter": get_column_letter(cell.column),
-                                "value": cell.value,
-                                "array_row_index": cell.row - worksheet.min_row,  # 0-based index for arrays
-                                "array_col_index": cell.column - worksheet.min_column  # 0-based index for arrays
-                            })
-                
-                return json.dumps({
+                        found.append((row_idx, col_idx, value))
+                        if len(found) == max_matches:
+                            break
+                    else:
+                        continue
+                    # Stop streaming the sheet once enough matches are found
+                    break
+                
+                # Expand the hits into response entries once the scan is over
+                matches = []
+                for row_idx, col_idx, value in found:
+                    col_letter = _COL_LETTERS[col_idx]
+                    matches.append({
+                        "cell_address": f"{col_letter}{row_idx}",
+                        "row": row_idx,
+                        "column": col_idx,
+                        "column_letter": col_letter,
+                        "value": value,
+                        "array_row_index": row_idx - sheet_min_row,  # 0-based index for arrays
+                        "array_col_index": col_idx - sheet_min_col  # 0-based index for arrays
+                    })
+                
+                return _dump({
                     "file_path": file_path,
                     "sheet_name": sheet_name,
                     "search_value": search_value,
                     "search_range": search_range,
                     "exact_match": exact_match,
+                    "max_matches": max_matches,
                     "matches": matches,
                     "total_matches": len(matches)
-                }, indent=2)
+                })
             except Exception as e:
-                return json.dumps({"error": str(e)})
+                return _dump({"error": str(e)}, pretty=False)
 
         @self.mcp.tool(name="add_formula")
-        async def add_formula(file_path: str, sheet_name: str, cell: str, formula: str) -> str:
+        @_in_thread(flush_pending=False)
+        def add_formula(file_path: str, sheet_name: str, cell: str, formula: str) -> str:
             """Add an Excel formula to a specific cell."""
             try:
-                workbook, worksheet = self._get_workbook_and_sheet(file_path, sheet_name)
+                row_idx, col_idx = _cell_position(cell)
                 
-                worksheet[cell] = f"={formula.lstrip('=')}"
-                
-                workbook.save(file_path)
-                return json.dumps({
+                # A workbook already in memory is edited there and saved once the edits pause,
+                # otherwise the sheet XML is patched in place when possible. A failed edit is
+                # rolled back, as the workbook may hold other edits waiting to be saved
+                workbook = self._cached_workbook(file_path)
+                if workbook is None and not self._patch_cell_xml(file_path, sheet_name, cell, f"={formula.lstrip('=')}"):
+                    workbook, _ = self._get_workbook_and_sheet(file_path, sheet_name, for_write=True)
+                if workbook is not None:
+                    _apply_cell_edits(workbook, sheet_name, [(row_idx, col_idx, f"={formula.lstrip('=')}")],
+                                      create_sheet=False)
+                    self._schedule_save(workbook, file_path)
+                return _dump({
                     "status": "success", "file_path": file_path, "sheet_name": sheet_name,
                     "cell": cell, "formula_added": f"={formula.lstrip('=')}"
-                }, indent=2)
+                })
             except Exception as e:
-                return json.dumps({"error": str(e)})
+                self._evict_workbook(file_path)
+                return _dump({"error": str(e)}, pretty=False)
 
         @self.mcp.tool(name="update_single_cell")
-        async def update_single_cell(file_path: str, sheet_name: str, cell: str, value: str) -> str:
+        @_in_thread(flush_pending=False)
+        def update_single_cell(file_path: str, sheet_name: str, cell: str, value: str) -> str:
             """Update a single cell with a specific value."""
             try:
-                workbook, worksheet = self._get_workbook_and_sheet(file_path, sheet_name, create_sheet=True)
-                
-                # Set the cell value directly
-                worksheet[cell] = value
+                row_idx, col_idx = _cell_position(cell)
                 
-                workbook.save(file_path)
-                return json.dumps({
+                # A workbook already in memory is edited there and saved once the edits pause,
+                # otherwise the sheet XML is patched in place when possible. A failed edit is
+                # rolled back, as the workbook may hold other edits waiting to be saved
+                workbook = self._cached_workbook(file_path)
+                if workbook is None and not self._patch_cell_xml(file_path, sheet_name, cell, value):
+                    workbook, _ = self._get_workbook_and_sheet(file_path, sheet_name, create_sheet=True, for_write=True)
+                if workbook is not None:
+                    _apply_cell_edits(workbook, sheet_name, [(row_idx, col_idx, value)])
+                    self._schedule_save(workbook, file_path)
+                return _dump({
                     "status": "success", 
                     "file_path": file_path, 
                     "sheet_name": sheet_name,
                     "cell": cell, 
                     "value_set": value,
                     "message": f"Cell {cell} updated to '{value}'"
-                }, indent=2)
+                })
             except Exception as e:
-                return json.dumps({"error": str(e)})
+                self._evict_workbook(file_path)
+                return _dump({"error": str(e)}, pretty=False)
+
+        @self.mcp.tool(name="bulk_update_cells")
+        @_in_thread(flush_pending=False)
+        def bulk_update_cells(file_path: str, sheet_name: str, edits: List[Dict[str, Any]]) -> str:
+            """Update many cells at once; each edit is {"cell": "A1", "value": ...}."""
+            try:
+                # Check every edit before touching the workbook so a bad one changes nothing
+                targets = []
+                for idx, edit in enumerate(edits):
+                    if not isinstance(edit, dict) or "cell" not in edit or "value" not in edit:
+                        raise ValueError(f"Edit {idx} must have 'cell' and 'value' keys")
+                    cell = str(edit["cell"]).upper()
+                    if not _CELL_RE.fullmatch(cell):
+                        raise ValueError(f"Edit {idx} has an invalid cell reference: {edit['cell']}")
+                    row_idx, col_idx = coordinate_to_tuple(cell)
+                    if not 1 <= row_idx <= 1048576 or col_idx > 16384:
+                        raise ValueError(f"Edit {idx} has an invalid cell reference: {edit['cell']}")
+                    value = edit["value"]
+                    if value is not None and not isinstance(value, _CELL_VALUE_TYPES):
+                        raise ValueError(f"Edit {idx} has an unsupported value type: {type(value).__name__}")
+                    if isinstance(value, str) and ILLEGAL_CHARACTERS_RE.search(value):
+                        raise ValueError(f"Edit {idx} has a value with characters Excel cannot store")
+                    targets.append((row_idx, col_idx, value))
+                
+                # All edits go through one workbook in memory, which is saved once they pause.
+                # Edits the checks above cannot see, such as writes to merged cells, fail
+                # without leaving any of the batch behind
+                workbook = self._cached_workbook(file_path)
+                if workbook is None:
+                    workbook, _ = self._get_workbook_and_sheet(file_path, sheet_name, create_sheet=True, for_write=True)
+                _apply_cell_edits(workbook, sheet_name, targets)
+                if targets:
+                    self._schedule_save(workbook, file_path)
+                return _dump({
+                    "status": "success",
+                    "file_path": file_path,
+                    "sheet_name": sheet_name,
+                    "cells_updated": len(targets),
+                    "message": f"Updated {len(targets)} cells in {sheet_name}"
+                })
+            except Exception as e:
+                self._evict_workbook(file_path)
+                return _dump({"error": str(e)}, pretty=False)
+
+        @self.mcp.tool(name="flush_excel_file")
+        @_in_thread(flush_pending=None)
+        def flush_excel_file(file_path: str) -> str:
+            """Save edits to a file that are still held in memory."""
+            try:
+                flushed = _flush_pending(file_path)
+                return _dump({"status": "success", "file_path": file_path, "flushed": flushed})
+            except Exception as e:
+                self._evict_workbook(file_path)
+                return _dump({"error": str(e)}, pretty=False)
 
     # --- Helper Methods ---
 
     def _get_workbook_and_sheet(self, file_path: str, sheet_name: Optional[str] = None, 
-                               create_sheet: bool = False, data_only: bool = False) -> tuple[openpyxl.Workbook, Optional[Worksheet]]:
+                               create_sheet: bool = False, data_only: bool = False,
+                               read_only: bool = False, for_write: bool = False) -> tuple[openpyxl.Workbook, Optional[Worksheet]]:
         """
         Loads a workbook and a specific sheet, creating them if necessary.
         
@@ -749,27 +1397,32 @@ class ExcelFastMCPServer:
             sheet_name: Name of the sheet to get/create
             create_sheet: Whether to create sheet if it doesn't exist
             data_only: Whether to load the workbook with data_only=True (formulas as values)
+            read_only: Whether to load the workbook in streaming read-only mode
+            for_write: Whether the workbook will be saved back to file_path
         """
         try:
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            # Create directory if it doesn't exist, only needed when the file gets written
+            directory = os.path.dirname(file_path)
+            if for_write and directory:
+                os.makedirs(directory, exist_ok=True)
             
             workbook = None
-            try:
-                # Only try to load if file exists and has content
-                if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
-                    workbook = openpyxl.load_workbook(file_path, data_only=data_only)
-                else:
-                    raise FileNotFoundError("File does not exist or is empty")
-            except (FileNotFoundError, Exception) as e:
-                if create_sheet:
-                    # Create a new workbook
-                    workbook = openpyxl.Workbook()
-                    # Remove the default sheet if we're going to create a specific one
-                    if sheet_name and sheet_name != workbook.active.title:
-                        workbook.remove(workbook.active)
-                else:
-                    raise ValueError(f"Error loading workbook: {str(e)}")
+            # Only try to load if file exists and has content
+            if os.path.isfile(file_path) and os.path.getsize(file_path) > 0:
+                # A file that fails to load is reported, never replaced by an empty workbook
+                try:
+                    workbook = self._load_workbook(file_path, data_only, read_only)
+                except zipfile.BadZipFile as e:
+                    raise ValueError(f"Corrupt xlsx: {e}")
+            elif not create_sheet:
+                raise FileNotFoundError("Error loading workbook: File does not exist or is empty")
+            
+            if workbook is None:
+                # Create a new workbook
+                workbook = openpyxl.Workbook()
+                # Remove the default sheet if we're going to create a specific one
+                if sheet_name and sheet_name != workbook.active.title:
+                    workbook.remove(workbook.active)
             
             worksheet = None
             if sheet_name:
@@ -784,36 +1437,330 @@ class ExcelFastMCPServer:
         except Exception as e:
             raise Exception(f"Error in _get_workbook_and_sheet: {str(e)}")
 
-    def _iterate_cells_in_range(self, worksheet: Worksheet, cell_range: str) -> Generator[Cell, None, None]:
-        """A helper to yield each cell in a given range string."""
+    def _load_workbook(self, file_path: str, data_only: bool = False, read_only: bool = False) -> openpyxl.Workbook:
+        """
+        Returns the parsed workbook for a file, reusing the cached one while the file is unchanged.
+        
+        Args:
+            file_path: Path to an existing Excel file
+            data_only: Whether to load the workbook with data_only=True (formulas as values)
+            read_only: Whether to load the workbook in streaming read-only mode
+        """
+        if not (data_only or read_only):
+            workbook = self._cached_workbook(file_path)
+            if workbook is not None:
+                return workbook
+        
+        key = self._workbook_cache_key(file_path, data_only, read_only)
+        with _WB_LOCK:
+            workbook = _WB_CACHE.get(key)
+            if workbook is not None:
+                _WB_CACHE.move_to_end(key)
+                return workbook
+        
+        workbook = openpyxl.load_workbook(file_path, **_LOAD_KW[data_only, read_only])
+        
+        # Parses of an older version of the file can never be hit again
+        with _WB_LOCK:
+            stale = [k for k in _WB_CACHE if k[0] == key[0] and k[1:3] != key[1:3]]
+            for stale_key in stale:
+                _WB_CACHE.pop(stale_key).close()
+            self._cache_workbook(key, workbook)
+        return workbook
+
+    def _cached_workbook(self, file_path: str, data_only: bool = False) -> Optional[openpyxl.Workbook]:
+        """Returns the editable workbook with pending edits or cached for the current version of a file, if any."""
+        if not data_only:
+            with _WB_LOCK:
+                pending = _PENDING_SAVES.get(os.path.realpath(file_path))
+            if pending is not None:
+                return pending[0]
         try:
-            cells = worksheet[cell_range]
-            if isinstance(cells, Cell):
-                yield cells
-            elif isinstance(cells, tuple):
-                for row in cells:
-                    if isinstance(row, tuple):
-                        for cell in row:
-                            yield cell
-                    else:
-                        yield row
-            else: # A single row range
-                for cell in cells:
-                    yield cell
-        except Exception as e:
-            # Fallback for complex ranges
-            if ':' in cell_range:
-                start_cell, end_cell = cell_range.split(':')
-                start_row, start_col = coordinate_from_string(start_cell)
-                end_row, end_col = coordinate_from_string(end_cell)
-                start_col_idx = column_index_from_string(start_col)
-                end_col_idx = column_index_from_string(end_col)
-                
-                for row in range(start_row, end_row + 1):
-                    for col in range(start_col_idx, end_col_idx + 1):
-                        yield worksheet.cell(row=row, column=col)
-            else:
-                yield worksheet[cell_range]
+            key = self._workbook_cache_key(file_path, data_only)
+        except OSError:
+            return None
+        with _WB_LOCK:
+            workbook = _WB_CACHE.get(key)
+            if workbook is not None:
+                _WB_CACHE.move_to_end(key)
+        return workbook
+
+    def _save_workbook(self, workbook: openpyxl.Workbook, file_path: str) -> None:
+        """
+        Saves a workbook and keeps it cached under the file's new modification time.
+        
+        The workbook is written next to the file and then swapped in, so a failed save
+        never leaves a truncated file behind. A symlinked path is resolved first, so the
+        link is kept and its target gets the new contents.
+        """
+        self._evict_workbook(file_path, keep=workbook)
+        real_path = os.path.realpath(file_path)
+        temp_path = f"{real_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            workbook.save(temp_path)
+            if os.path.exists(real_path):
+                shutil.copymode(real_path, temp_path)
+            os.replace(temp_path, real_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._cache_workbook(self._workbook_cache_key(file_path), workbook)
+
+    def _schedule_save(self, workbook: openpyxl.Workbook, file_path: str) -> None:
+        """
+        Marks a workbook as edited and saves it once no further edit arrives for _SAVE_DELAY
+        seconds. Other tools, and flush_excel_file, save pending edits right away.
+        """
+        real_path = os.path.realpath(file_path)
+        timer = threading.Timer(_SAVE_DELAY, self._save_pending, (file_path,))
+        with _WB_LOCK:
+            previous = _PENDING_SAVES.get(real_path)
+            if previous is not None:
+                previous[1].cancel()
+            _PENDING_SAVES[real_path] = (workbook, timer, functools.partial(self._save_workbook, workbook, file_path), None)
+        timer.start()
+
+    def _save_pending(self, file_path: str) -> None:
+        """Timer callback saving a file's deferred edits; a failed save stays pending for the next call."""
+        with _file_lock(file_path):
+            try:
+                _flush_pending(file_path)
+            except Exception:
+                logger.exception("Saving pending edits to %s failed", file_path)
+
+    def _evict_workbook(self, file_path: str, keep: Optional[openpyxl.Workbook] = None) -> None:
+        """
+        Drops every cached parse of a file, closing the ones that hold the archive open.
+        
+        Tools that modify a workbook call this when they fail, so that half-applied
+        changes are never served from the cache. A workbook waiting for a deferred save is
+        not affected; the tools editing it roll their changes back with _apply_cell_edits.
+        """
+        real_path = os.path.realpath(file_path)
+        with _WB_LOCK:
+            evicted = [_WB_CACHE.pop(key) for key in list(_WB_CACHE) if key[0] == real_path]
+        for workbook in evicted:
+            if workbook is not keep:
+                workbook.close()
+
+    def _workbook_cache_key(self, file_path: str, data_only: bool = False, read_only: bool = False) -> tuple:
+        """Builds the cache key identifying the current version of a file."""
+        stat = os.stat(file_path)
+        return (os.path.realpath(file_path), stat.st_mtime_ns, stat.st_size, data_only, read_only)
+
+    def _cache_workbook(self, key: tuple, workbook: openpyxl.Workbook) -> None:
+        """
+        Adds a workbook to the cache, evicting the least recently used ones beyond its size.
+        
+        Evicted read-only workbooks hold their archive open, so they are closed, but only once
+        no call on their file is running, as such a call may still be reading them.
+        """
+        closing = []
+        with _WB_LOCK:
+            _WB_CACHE[key] = workbook
+            while len(_WB_CACHE) > _WB_CACHE_SIZE:
+                evicted_key, evicted = _WB_CACHE.popitem(last=False)
+                real_path, read_only = evicted_key[0], evicted_key[4]
+                if not read_only:
+                    continue
+                if real_path in _FILE_LOCKS:
+                    _CLOSE_LATER.setdefault(real_path, []).append(evicted)
+                else:
+                    closing.append(evicted)
+        for evicted in closing:
+            evicted.close()
+
+    def _stream_new_workbook(self, file_path: str, sheet_name: str, data: List[List[Any]],
+                             write_value: Callable[[Cell, Any], None], autofit: bool = False) -> None:
+        """
+        Writes rows to a brand new single-sheet workbook using openpyxl's write-only mode.
+        
+        Args:
+            file_path: Path of the Excel file to create
+            sheet_name: Name of the sheet to create
+            data: Rows of values to write starting at A1
+            write_value: Function storing a value (and its number format) on a cell
+            autofit: Whether to size columns to their content, capped at 50
+        """
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        workbook = openpyxl.Workbook(write_only=True)
+        worksheet = workbook.create_sheet(sheet_name)
+        
+        # Column widths are written in the sheet header, so they must be set before any row
+        if autofit:
+            for col_idx, length in enumerate(_column_lengths(data)):
+                if length:
+                    worksheet.column_dimensions[_COL_LETTERS[col_idx + 1]].width = min(length + 2, 50)
+        
+        for row_data in data:
+            row = []
+            for value in row_data:
+                cell = WriteOnlyCell(worksheet)
+                write_value(cell, value)
+                row.append(cell)
+            worksheet.append(row)
+        
+        self._evict_workbook(file_path)
+        workbook.save(file_path)
+
+    def _patch_cell_xml(self, file_path: str, sheet_name: str, coordinate: str, value: str) -> bool:
+        """
+        Writes a string to one cell by editing the sheet XML inside the archive in place.
+        
+        Unlike a load and save through openpyxl, the cost does not grow with the size of the
+        workbook, and parts openpyxl does not round-trip are kept. The value is bound the way
+        openpyxl binds strings: '=...' becomes a formula, error codes become errors and
+        anything else an inline string.
+        
+        Args:
+            file_path: Path to an existing Excel file
+            sheet_name: Name of an existing sheet
+            coordinate: Single cell reference like 'A1'
+            value: String to store
+        
+        Returns:
+            False, leaving the file untouched, when the edit cannot be made safely at the
+            XML level; the caller then goes through openpyxl instead.
+        """
+        coordinate = coordinate.upper()
+        if not isinstance(value, str) or not _CELL_RE.fullmatch(coordinate) or not os.path.isfile(file_path):
+            return False
+        value = value[:32767]
+        if ILLEGAL_CHARACTERS_RE.search(value):
+            return False
+        row_idx, col_idx = coordinate_to_tuple(coordinate)
+        
+        try:
+            archive = zipfile.ZipFile(file_path)
+        except zipfile.BadZipFile:
+            return False
+        with archive:
+            try:
+                workbook_xml = archive.read("xl/workbook.xml")
+                sheet_part = dict(_sheet_parts(archive, ET.fromstring(workbook_xml))).get(sheet_name)
+                if sheet_part is None:
+                    return False
+                sheet_xml = archive.read(sheet_part)
+            except (KeyError, ET.ParseError):
+                return False
+            
+            sheet_xml = _set_sheet_xml_cell(sheet_xml, row_idx, col_idx, value,
+                                            "xl/calcChain.xml" in archive.NameToInfo)
+            if sheet_xml is None:
+                return False
+            patched = {sheet_part: sheet_xml}
+            
+            # Formulas are stored without a cached value, Excel has to recalculate on open
+            if len(value) > 1 and value.startswith("=") and b'fullCalcOnLoad="1"' not in workbook_xml:
+                if b'fullCalcOnLoad' in workbook_xml or b'<calcPr' not in workbook_xml:
+                    return False
+                patched["xl/workbook.xml"] = workbook_xml.replace(b'<calcPr', b'<calcPr fullCalcOnLoad="1"', 1)
+            
+            # Copy every other part as is into a sibling file, then swap it in atomically;
+            # a symlinked path is resolved so the link keeps pointing at the edited file
+            real_path = os.path.realpath(file_path)
+            fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(real_path))
+            try:
+                with os.fdopen(fd, "wb") as temp_file, zipfile.ZipFile(temp_file, "w") as target_archive:
+                    target_archive.comment = archive.comment
+                    for info in archive.infolist():
+                        if info.filename in patched:
+                            target_archive.writestr(info, patched[info.filename])
+                        else:
+                            with archive.open(info) as source, target_archive.open(info, "w") as dest:
+                                shutil.copyfileobj(source, dest, 1 << 20)
+                shutil.copymode(real_path, temp_path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+        
+        self._evict_workbook(file_path)
+        os.replace(temp_path, real_path)
+        return True
+
+    def _read_workbook_metadata(self, file_path: str, include_ranges: bool = False,
+                                include_merged: bool = False) -> Optional[dict]:
+        """
+        Builds get_workbook_metadata's summary from the package parts, without loading cells.
+        
+        Sheet names and the active tab come from xl/workbook.xml. With include_ranges, each
+        sheet's size comes from its <dimension> ref, the merged range count from the count
+        attribute of <mergeCells> and tables from the sheet's relationships. The merged
+        ranges themselves are only listed with include_merged.
+        
+        Returns:
+            None when the file is not a workbook package this can read, in which case the
+            caller loads it with openpyxl instead.
+        """
+        if not os.path.isfile(file_path):
+            return None
+        try:
+            archive = zipfile.ZipFile(file_path)
+        except zipfile.BadZipFile:
+            return None
+        with archive:
+            try:
+                workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+                sheets = _sheet_parts(archive, workbook)
+                view = workbook.find(f"{_NS_MAIN}bookViews/{_NS_MAIN}workbookView")
+                active_tab = int(view.get("activeTab", 0)) if view is not None else 0
+                
+                metadata = {
+                    "file_path": file_path,
+                    "sheet_count": len(sheets),
+                    "sheet_names": [name for name, _ in sheets],
+                    "active_sheet": sheets[active_tab][0] if 0 <= active_tab < len(sheets) else None
+                }
+                
+                if include_ranges:
+                    sheet_info = {}
+                    for sheet_name, part in sheets:
+                        sheet_xml = archive.read(part)
+                        if b'<sheetData' not in sheet_xml:
+                            # Chartsheets, or markup with namespace prefixes
+                            return None
+                        max_row, max_col = _sheet_xml_extent(sheet_xml)
+                        # <mergeCells> follows the cell data, which may be an empty <sheetData/>
+                        data_end = sheet_xml.rfind(b'</sheetData>')
+                        if data_end < 0:
+                            data_end = sheet_xml.find(b'<sheetData')
+                        merge_start = sheet_xml.find(b'<mergeCells', data_end)
+                        merged = []
+                        merged_count = 0
+                        if merge_start >= 0:
+                            count = _XML_MERGE_COUNT_RE.match(sheet_xml, merge_start)
+                            if include_merged or count is None:
+                                merged = [ref.decode() for ref in _XML_MERGE_REF_RE.findall(
+                                    sheet_xml, merge_start, sheet_xml.index(b'</mergeCells>', merge_start))]
+                                merged_count = len(merged)
+                            else:
+                                merged_count = int(count.group(1))
+                        
+                        rels_part = posixpath.join(posixpath.dirname(part), "_rels",
+                                                   posixpath.basename(part) + ".rels")
+                        table_count = 0
+                        if rels_part in archive.NameToInfo:
+                            rels = ET.fromstring(archive.read(rels_part))
+                            table_count = sum(rel.get("Type", "").endswith("/table")
+                                              for rel in rels.iter(_NS_PKG_REL))
+                        
+                        sheet_info[sheet_name] = {
+                            "max_row": max_row,
+                            "max_column": max_col,
+                            "data_range": f"A1:{_COL_LETTERS[max_col]}{max_row}",
+                            "merged_cell_count": merged_count,
+                            "table_count": table_count
+                        }
+                        if include_merged:
+                            sheet_info[sheet_name]["merged_cells"] = merged
+                    metadata["sheets_info"] = sheet_info
+            except (KeyError, ValueError, ET.ParseError):
+                return None
+        return metadata
 
     def run(self):
         """Run the FastMCP server."""
@@ -0,0 +1,239 @@
+"""
+Tests for the in-place sheet XML patch behind update_single_cell and add_formula.
+
+Every case patches one copy of a workbook and writes the same value into another copy
+through openpyxl; both have to read back the same.
+"""
+
+import re
+import shutil
+import zipfile
+
+import openpyxl
+import pytest
+from openpyxl.styles import Font, PatternFill
+
+# The server module needs fastmcp at import time
+excel_server = pytest.importorskip("excel_fastmcp_server", exc_type=ImportError)
+
+SHEET_PART = "xl/worksheets/sheet1.xml"
+
+
+@pytest.fixture(scope="module")
+def server():
+    return excel_server.ExcelFastMCPServer()
+
+
+def _make_workbook(path, build=None):
+    """Save a single-sheet workbook named 'S', filled in by build."""
+    workbook = openpyxl.Workbook()
+    worksheet = workbook.active
+    worksheet.title = "S"
+    if build is not None:
+        build(worksheet)
+    workbook.save(path)
+
+
+def _rewrite_part(path, part, transform):
+    """Replace one part of the package with transform(its bytes)."""
+    with zipfile.ZipFile(path) as archive:
+        parts = [(info, archive.read(info)) for info in archive.infolist()]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for info, data in parts:
+            archive.writestr(info, transform(data) if info.filename == part else data)
+
+
+def _add_part(path, part, data):
+    with zipfile.ZipFile(path, "a") as archive:
+        archive.writestr(part, data)
+
+
+def _snapshot(path):
+    """Everything the tools read back from sheet 'S': values, types, styles and row heights."""
+    worksheet = openpyxl.load_workbook(path)["S"]
+    cells = {
+        cell.coordinate: (cell.value, cell.data_type, cell.number_format,
+                          cell.font.b, cell.fill.fgColor.rgb)
+        for row in worksheet.iter_rows() for cell in row if cell.value is not None
+    }
+    heights = {idx: dims.height for idx, dims in worksheet.row_dimensions.items() if dims.height}
+    return cells, heights, sorted(str(merged) for merged in worksheet.merged_cells.ranges)
+
+
+def _extent(path):
+    """The sheet size read-only tools take from the <dimension> tag."""
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    worksheet = workbook["S"]
+    extent = (worksheet.max_row, worksheet.max_column)
+    workbook.close()
+    return extent
+
+
+def _patch_and_compare(server, tmp_path, source, coordinate, value, check_extent=True):
+    """Patch a copy of source and check it reads back like an openpyxl edit of another copy."""
+    patched = tmp_path / "patched.xlsx"
+    expected = tmp_path / "expected.xlsx"
+    shutil.copy(source, patched)
+    shutil.copy(source, expected)
+
+    assert server._patch_cell_xml(str(patched), "S", coordinate, value)
+
+    workbook = openpyxl.load_workbook(expected)
+    workbook["S"][coordinate] = value
+    workbook.save(expected)
+
+    assert _snapshot(patched) == _snapshot(expected)
+    if check_extent:
+        assert _extent(patched) == _extent(expected)
+    return patched
+
+
+def _fill(worksheet):
+    worksheet["A1"] = "a1"
+    worksheet["C1"] = "c1"
+    worksheet["A2"] = 2
+    worksheet["A5"] = "a5"
+
+
+@pytest.mark.parametrize("value", ["plain", " padded ", "<&>", "#N/A", "=SUM(A1:A2)"])
+def test_new_row_at_end(server, tmp_path, value):
+    source = tmp_path / "source.xlsx"
+    _make_workbook(source, _fill)
+    _patch_and_compare(server, tmp_path, source, "B9", value)
+
+
+def test_padded_string_keeps_its_spaces(server, tmp_path):
+    source = tmp_path / "source.xlsx"
+    _make_workbook(source, _fill)
+    patched = _patch_and_compare(server, tmp_path, source, "B2", " padded ")
+    # Excel trims text without xml:space="preserve", even where openpyxl does not
+    with zipfile.ZipFile(patched) as archive:
+        assert b'<t xml:space="preserve"> padded </t>' in archive.read(SHEET_PART)
+
+
+def test_new_row_between_rows(server, tmp_path):
+    source = tmp_path / "source.xlsx"
+    _make_workbook(source, _fill)
+    patched = _patch_and_compare(server, tmp_path, source, "D3", "between")
+    rows = [row[0].row for row in openpyxl.load_workbook(patched)["S"].iter_rows() if row[0].value is not None]
+    assert rows == sorted(rows)
+
+
+def test_cell_inserted_mid_row(server, tmp_path):
+    source = tmp_path / "source.xlsx"
+    _make_workbook(source, _fill)
+    _patch_and_compare(server, tmp_path, source, "B1", "b1")
+
+
+def test_cell_appended_to_row(server, tmp_path):
+    source = tmp_path / "source.xlsx"
+    _make_workbook(source, _fill)
+    _patch_and_compare(server, tmp_path, source, "F2", "f2")
+
+
+def test_self_closing_row(server, tmp_path):
+    source = tmp_path / "source.xlsx"
+    _make_workbook(source, _fill)
+    _rewrite_part(source, SHEET_PART, lambda xml: xml.replace(
+        b'<row r="5"', b'<row r="3" spans="1:2" ht="30" customHeight="1"/><row r="5"', 1))
+    assert openpyxl.load_workbook(source)["S"].row_dimensions[3].height == 30
+    _patch_and_compare(server, tmp_path, source, "B3", "in empty row")
+
+
+def test_styled_cell_keeps_its_style(server, tmp_path):
+    def build(worksheet):
+        _fill(worksheet)
+        worksheet["C1"].font = Font(bold=True)
+        worksheet["C1"].fill = PatternFill("solid", fgColor="FFFF00")
+        worksheet["C1"].number_format = "0.00"
+    source = tmp_path / "source.xlsx"
+    _make_workbook(source, build)
+    _patch_and_compare(server, tmp_path, source, "C1", "replaced")
+
+
+def test_formula_replaced_by_value(server, tmp_path):
+    def build(worksheet):
+        _fill(worksheet)
+        worksheet["B2"] = "=A2*2"
+    source = tmp_path / "source.xlsx"
+    _make_workbook(source, build)
+    _patch_and_compare(server, tmp_path, source, "B2", "no longer a formula")
+
+
+def test_empty_sheet_data(server, tmp_path):
+    def build(worksheet):
+        worksheet.merge_cells("B2:C3")
+    source = tmp_path / "source.xlsx"
+    _make_workbook(source, build)
+    _rewrite_part(source, SHEET_PART,
+                  lambda xml: re.sub(rb'<sheetData>.*?</sheetData>|<sheetData\s*/>', b'<sheetData/>', xml, flags=re.S))
+    # The patch widens the existing A1 placeholder ref, openpyxl recomputes it from the cells
+    _patch_and_compare(server, tmp_path, source, "E4", "first", check_extent=False)
+
+
+def test_sheet_without_dimension(server, tmp_path):
+    source = tmp_path / "source.xlsx"
+    _make_workbook(source, _fill)
+    _rewrite_part(source, SHEET_PART, lambda xml: re.sub(rb'<dimension ref="[^"]*"\s*/>', b'', xml))
+    patched = _patch_and_compare(server, tmp_path, source, "G7", "far", check_extent=False)
+    with zipfile.ZipFile(patched) as archive:
+        assert b'<dimension' not in archive.read(SHEET_PART)
+
+
+def _assert_left_alone(server, tmp_path, source, coordinate, value):
+    """The patch must decline and leave the file byte for byte as it was."""
+    patched = tmp_path / "patched.xlsx"
+    shutil.copy(source, patched)
+    assert not server._patch_cell_xml(str(patched), "S", coordinate, value)
+    assert patched.read_bytes() == source.read_bytes()
+
+
+def test_shared_formula_falls_back(server, tmp_path):
+    def build(worksheet):
+        _fill(worksheet)
+        worksheet["B2"] = "=A2*2"
+    source = tmp_path / "source.xlsx"
+    _make_workbook(source, build)
+    _rewrite_part(source, SHEET_PART, lambda xml: re.sub(
+        rb'<f>A2\*2</f>', b'<f t="shared" ref="B2:B3" si="0">A2*2</f>', xml))
+    _assert_left_alone(server, tmp_path, source, "B2", "value")
+
+
+def test_calc_chain_formula_falls_back(server, tmp_path):
+    def build(worksheet):
+        _fill(worksheet)
+        worksheet["B2"] = "=A2*2"
+    source = tmp_path / "source.xlsx"
+    _make_workbook(source, build)
+    _add_part(source, "xl/calcChain.xml",
+              b'<calcChain xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+              b'<c r="B2" i="1"/></calcChain>')
+    _assert_left_alone(server, tmp_path, source, "B2", "value")
+
+
+def test_calc_chain_formula_replaced_by_formula(server, tmp_path):
+    def build(worksheet):
+        _fill(worksheet)
+        worksheet["B2"] = "=A2*2"
+    source = tmp_path / "source.xlsx"
+    _make_workbook(source, build)
+    _add_part(source, "xl/calcChain.xml",
+              b'<calcChain xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+              b'<c r="B2" i="1"/></calcChain>')
+    _patch_and_compare(server, tmp_path, source, "B2", "=A2*3")
+
+
+def test_illegal_characters_fall_back(server, tmp_path):
+    source = tmp_path / "source.xlsx"
+    _make_workbook(source, _fill)
+    _assert_left_alone(server, tmp_path, source, "B2", "bell\x07")
+
+
+def test_symlinked_path_updates_the_target(server, tmp_path):
+    source = tmp_path / "source.xlsx"
+    _make_workbook(source, _fill)
+    link = tmp_path / "link.xlsx"
+    link.symlink_to(source)
+    assert server._patch_cell_xml(str(link), "S", "B2", "through link")
+    assert link.is_symlink()
+    assert openpyxl.load_workbook(source)["S"]["B2"].value == "through link"